@@ -33,40 +33,38 @@ def readmission(filename):
     print(f"Reading mission from file: {filename}\n")
     missionlist = []
     with open(filename, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f):
-            if i == 0:
-                if not line.startswith("QGC WPL 110"):
-                    raise Exception("File is not supported WP version")
-            else:
-                linearray = line.split("\t")
-                ln_currentwp = int(linearray[1])
-                ln_frame = int(linearray[2])
-                ln_command = int(linearray[3])
-                ln_param1 = float(linearray[4])
-                ln_param2 = float(linearray[5])
-                ln_param3 = float(linearray[6])
-                ln_param4 = float(linearray[7])
-                ln_param5 = float(linearray[8])
-                ln_param6 = float(linearray[9])
-                ln_param7 = float(linearray[10])
-                ln_autocontinue = int(linearray[11].strip())
-                cmd = Command(
-                    0,
-                    0,
-                    0,
-                    ln_frame,
-                    ln_command,
-                    ln_currentwp,
-                    ln_autocontinue,
-                    ln_param1,
-                    ln_param2,
-                    ln_param3,
-                    ln_param4,
-                    ln_param5,
-                    ln_param6,
-                    ln_param7,
-                )
-                missionlist.append(cmd)
+        if not f.readline().startswith("QGC WPL 110"):
+            raise Exception("File is not supported WP version")
+        for line in f:
+            linearray = line.split("\t")
+            ln_currentwp = int(linearray[1])
+            ln_frame = int(linearray[2])
+            ln_command = int(linearray[3])
+            ln_param1 = float(linearray[4])
+            ln_param2 = float(linearray[5])
+            ln_param3 = float(linearray[6])
+            ln_param4 = float(linearray[7])
+            ln_param5 = float(linearray[8])
+            ln_param6 = float(linearray[9])
+            ln_param7 = float(linearray[10])
+            ln_autocontinue = int(linearray[11].strip())
+            cmd = Command(
+                0,
+                0,
+                0,
+                ln_frame,
+                ln_command,
+                ln_currentwp,
+                ln_autocontinue,
+                ln_param1,
+                ln_param2,
+                ln_param3,
+                ln_param4,
+                ln_param5,
+                ln_param6,
+                ln_param7,
+            )
+            missionlist.append(cmd)
     return missionlist
 
 
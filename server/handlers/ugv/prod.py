@@ -4,8 +4,10 @@ import logging
 import math
 import os
 import typing
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
 from dronekit import connect, Command, VehicleMode, Vehicle
 from pymavlink import mavutil as uavutil
 
@@ -17,6 +19,12 @@ if typing.TYPE_CHECKING:
 
 BAUDRATE = 57600
 
+_PARAMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ugv_params.json")
+
+_RAD2DEG = 180.0 / math.pi
+_DEG2RAD = math.pi / 180.0
+_DEG_TO_FT = 69.172 * 5280.0  # Decimal degrees to miles, then to feet
+
 COMMANDS = {
     # Takeoff will be initiated using a Flight Mode
     # "TAKEOFF": uavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
@@ -25,6 +33,28 @@ COMMANDS = {
     "GEOFENCE": uavutil.mavlink.MAV_CMD_NAV_FENCE_POLYGON_VERTEX_INCLUSION,
 }
 
+# Keyed by (armed, is_armable)
+ARMED_STATES = {
+    (True, True): "ARMED",
+    (True, False): "ARMED",
+    (False, True): "DISARMED (ARMABLE)",
+    (False, False): "DISARMED (NOT ARMABLE)",
+}
+
+
+def _dist_ft(cos_lat, dlat, dlon):
+    """
+    Approximate ground distance in feet for a small lat/lon offset, given cos() of the latitude.
+    """
+    x = dlat * cos_lat * _DEG_TO_FT
+    y = dlon * _DEG_TO_FT
+    return math.sqrt(x * x + y * y)
+
+
+@lru_cache(maxsize=16)
+def _mode(name):
+    return VehicleMode(name)
+
 
 def readmission(filename):
     """
@@ -33,43 +63,19 @@ def readmission(filename):
     This function is used by upload_mission().
     """
     print(f"Reading mission from file: {filename}\n")
-    missionlist = []
     with open(filename, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f):
-            if i == 0:
-                if not line.startswith("QGC WPL 110"):
-                    raise Exception("File is not supported WP version")
-            else:
-                linearray = line.split("\t")
-                ln_currentwp = int(linearray[1])
-                ln_frame = int(linearray[2])
-                ln_command = int(linearray[3])
-                ln_param1 = float(linearray[4])
-                ln_param2 = float(linearray[5])
-                ln_param3 = float(linearray[6])
-                ln_param4 = float(linearray[7])
-                ln_param5 = float(linearray[8])
-                ln_param6 = float(linearray[9])
-                ln_param7 = float(linearray[10])
-                ln_autocontinue = int(linearray[11].strip())
-                cmd = Command(
-                    0,
-                    0,
-                    0,
-                    ln_frame,
-                    ln_command,
-                    ln_currentwp,
-                    ln_autocontinue,
-                    ln_param1,
-                    ln_param2,
-                    ln_param3,
-                    ln_param4,
-                    ln_param5,
-                    ln_param6,
-                    ln_param7,
-                )
-                missionlist.append(cmd)
-    return missionlist
+        if not f.readline().startswith("QGC WPL 110"):
+            raise Exception("File is not supported WP version")
+        body = f.read()
+    # A header-only file has no waypoints (and would make loadtxt warn on empty input)
+    if not body.strip():
+        return []
+    # Columns: index, current wp, frame, command, params 1-7, autocontinue
+    rows = np.loadtxt(body.splitlines(), delimiter="\t", dtype=np.float64, ndmin=2)
+    # tolist() converts whole columns to Python ints/floats in C, avoiding per-element unboxing
+    ints = rows[:, [2, 3, 1, 11]].astype(np.int32).tolist()  # frame, command, current wp, autocont
+    params = rows[:, 4:11].tolist()
+    return [Command(0, 0, 0, *i, *p) for i, p in zip(ints, params)]
 
 
 def download_mission(vehicle):
@@ -77,13 +83,10 @@ def download_mission(vehicle):
     Downloads the current mission and returns it in a list.
     It is used in save_mission() to get the file information to save.
     """
-    missionlist = []
     cmds = vehicle.commands
     cmds.download()
     cmds.wait_ready()
-    for cmd in cmds:
-        missionlist.append(cmd)
-    return missionlist
+    return list(cmds)
 
 
 @decorate_all_functions(log, logging.getLogger("groundstation"))
@@ -114,7 +117,18 @@ class UGVHandler:
             self.mode,
             self.gps,
         ) = [None] * 11
-        self.mode = VehicleMode("MANUAL")
+        self._drop_lat, self._drop_lon = None, None
+        self._last_lat, self._last_cos = None, None
+        self.mode = _mode("MANUAL")
+        self._quick_result = {
+            "yaw": None,
+            "lat": None,
+            "lon": None,
+            "ground_speed": None,
+            "battery": None,
+            "destination": None,
+            "connection": None,
+        }
         self.commands = []
         self.armed = False
         self.status = "BOOT"
@@ -142,43 +156,43 @@ class UGVHandler:
             loc = self.vehicle.location.global_relative_frame
             rpy = self.vehicle.attitude  # Roll, Pitch, Yaw
             battery = self.vehicle.battery
-            self.yaw = rpy.yaw * 180 / math.pi
-            self.yaw += 360 if self.yaw < 0 else 0
+            self.yaw = (rpy.yaw * _RAD2DEG) % 360.0
             self.ground_speed = self.vehicle.groundspeed * self.mph
             self.battery = battery.voltage  # * 0.001  # Millivolts to volts?
             self.lat = loc.lat
             self.lon = loc.lon
             self.gps = self.vehicle.gps_0
             self.connection = [self.gps.eph, self.gps.epv, self.gps.satellites_visible]
-            self.mode = self.vehicle.mode
             if not self.droppos:
                 self.droppos = self.gs.interop.get_data("ugv")
                 self.droppos = self.droppos["result"]
-            x_dist = self.droppos["drop"]["latitude"] - self.lat
-            y_dist = self.droppos["drop"]["longitude"] - self.lon
-            # Conversion from decimal degrees to miles
-            x_dist_ft = x_dist * (math.cos(self.lat * math.pi / 180) * 69.172) * 5280
-            y_dist_ft = y_dist * 69.172 * 5280
-            self.dist_to_dest = math.sqrt(x_dist_ft**2 + y_dist_ft**2)
+                self._drop_lat = self.droppos["drop"]["latitude"]
+                self._drop_lon = self.droppos["drop"]["longitude"]
+            x_dist = self._drop_lat - self.lat
+            y_dist = self._drop_lon - self.lon
+            # cos(lat) barely changes between ticks; only recompute after moving ~1 m
+            if self._last_lat is None or abs(self.lat - self._last_lat) > 1e-5:
+                self._last_cos = math.cos(self.lat * _DEG2RAD)
+                self._last_lat = self.lat
+            self.dist_to_dest = _dist_ft(self._last_cos, x_dist, y_dist)
             self.dest = [self.droppos, self.dist_to_dest]
             self.mode = self.vehicle.mode
             self.armed = self.vehicle.armed
+            self.status = self.vehicle.system_status.state
+            quick = self._quick_result
+            quick["yaw"] = self.yaw
+            quick["lat"] = self.lat
+            quick["lon"] = self.lon
+            quick["ground_speed"] = self.ground_speed
+            quick["battery"] = self.battery
+            quick["destination"] = self.dest
+            quick["connection"] = self.connection
             return {}
         except Exception as e:
             raise GeneralError(str(e)) from e
 
     def quick(self):
-        return {
-            "result": {
-                "yaw": self.yaw,
-                "lat": self.lat,
-                "lon": self.lon,
-                "ground_speed": self.ground_speed,
-                "battery": self.battery,
-                "destination": self.dest,
-                "connection": self.connection,
-            }
-        }
+        return {"result": self._quick_result.copy()}
 
     def stats(self):
         return {
@@ -187,7 +201,7 @@ class UGVHandler:
                 "mode": self.mode.name,
                 "commands": [cmd.to_dict() for cmd in self.commands],
                 "armed": self.get_armed()["result"],
-                "status": self.vehicle.system_status.state,
+                "status": self.status,
             }
         }
 
@@ -227,7 +241,7 @@ class UGVHandler:
 
     def set_flight_mode(self, flightmode):
         try:
-            self.mode = self.vehicle.mode = VehicleMode(flightmode)
+            self.mode = self.vehicle.mode = _mode(flightmode)
             return {}
         except Exception as e:
             raise GeneralError(str(e)) from e
@@ -251,11 +265,7 @@ class UGVHandler:
     @wait_for_param_load
     def get_params(self):
         try:
-            return {
-                "result": dict(
-                    (keys, values) for keys, values in tuple(self.vehicle.parameters.items())
-                )
-            }
+            return {"result": dict(self.vehicle.parameters.items())}
         except Exception as e:
             raise GeneralError(str(e)) from e
 
@@ -273,14 +283,13 @@ class UGVHandler:
 
     @wait_for_param_load
     def set_params(self, **kwargs):
+        try:
+            for value in kwargs.values():
+                float(value)
+        except (ValueError, TypeError) as e:
+            raise InvalidRequestError("Parameter Value cannot be converted to float") from e
         try:
             for key, value in kwargs.items():
-                try:
-                    float(value)
-                except ValueError as e:
-                    raise InvalidRequestError(
-                        "Parameter Value cannot be converted to float"
-                    ) from e
                 self.vehicle.parameters[key] = value
             return {}
         except Exception as e:
@@ -289,12 +298,8 @@ class UGVHandler:
     @wait_for_param_load
     def save_params(self):
         try:
-            with open(
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), "ugv_params.json"),
-                "w",
-                encoding="utf-8",
-            ) as file:
-                json.dump(self.vehicle.parameters, file)
+            with open(_PARAMS_PATH, "w", encoding="utf-8") as file:
+                file.write(json.dumps(dict(self.vehicle.parameters.items())))
             return {}
         except Exception as e:
             raise GeneralError(str(e)) from e
@@ -302,11 +307,7 @@ class UGVHandler:
     @wait_for_param_load
     def load_params(self):
         try:
-            with open(
-                os.path.join(os.path.dirname(os.path.abspath(__file__)), "ugv_params.json"),
-                "r",
-                encoding="utf-8",
-            ) as file:
+            with open(_PARAMS_PATH, "r", encoding="utf-8") as file:
                 self.vehicle.parameters = json.load(file)
             return {}
         except Exception as e:
@@ -365,12 +366,9 @@ class UGVHandler:
 
     def get_armed(self):
         try:
-            if self.vehicle.armed:
-                return {"result": "ARMED"}
-            elif self.vehicle.is_armable:
-                return {"result": "DISARMED (ARMABLE)"}
-            else:
-                return {"result": "DISARMED (NOT ARMABLE)"}
+            armed = bool(self.vehicle.armed)
+            armable = armed or bool(self.vehicle.is_armable)
+            return {"result": ARMED_STATES[(armed, armable)]}
         except Exception as e:
             raise GeneralError(str(e)) from e
 
@@ -1,7 +1,7 @@
 import functools
 import inspect
 from functools import wraps
-from logging import Logger
+from logging import DEBUG, Logger
 from typing import Callable, Any
 
 from utils.errors import InvalidStateError
@@ -21,6 +21,8 @@ log_exempt: tuple = (
 def log(func: Callable, logger: Logger) -> Callable:
     @wraps(func)
     def wrapper(*args, **kwargs):
+        if not logger.isEnabledFor(DEBUG):
+            return func(*args, **kwargs)
         res = None
         try:
             res = func(*args, **kwargs)